@@ -17,6 +17,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+from absl.testing import parameterized
 import numpy as np
 
 from tensorflow.python.eager import context
@@ -25,109 +26,128 @@ from tensorflow.python.framework import dtypes
 from tensorflow.python.framework import errors
 from tensorflow.python.framework import test_util
 from tensorflow.python.ops import array_ops
-from tensorflow.python.ops import gradient_checker
+from tensorflow.python.ops import gradient_checker_v2
+from tensorflow.python.ops import gradients_impl
 from tensorflow.python.platform import test as test_lib
 
+_RNG = np.random.RandomState(20151026)
 
-class BroadcastToTest(test_util.TensorFlowTestCase):
+# (values, dtypes) inputs broadcast to [3, 3] by testBroadcastToBasic.
+_BASIC_CASES = [
+    ([1, 2, 3], [dtypes.uint8, dtypes.uint16, dtypes.int8, dtypes.int16,
+                 dtypes.int32, dtypes.int64]),
+    ([b"1", b"2", b"3"], [dtypes.string]),
+    ([True, False, True], [dtypes.bool]),
+]
 
-  @test_util.run_deprecated_v1
-  def testBroadcastToBasic(self):
-    for dtype in [np.uint8, np.uint16, np.int8, np.int16, np.int32, np.int64]:
-      with self.session(use_gpu=True):
-        x = np.array([1, 2, 3], dtype=dtype)
-        v_tf = array_ops.broadcast_to(constant_op.constant(x), [3, 3])
-        v_np = np.broadcast_to(x, [3, 3])
-        self.assertAllEqual(v_tf.eval(), v_np)
 
-  @test_util.run_deprecated_v1
-  def testBroadcastToString(self):
-    with self.session(use_gpu=True):
-      x = np.array([b"1", b"2", b"3"])
-      v_tf = array_ops.broadcast_to(constant_op.constant(x), [3, 3])
-      v_np = np.broadcast_to(x, [3, 3])
-      self.assertAllEqual(v_tf.eval(), v_np)
+class BroadcastToTest(test_util.TensorFlowTestCase, parameterized.TestCase):
 
-  @test_util.run_deprecated_v1
-  def testBroadcastToBool(self):
-    with self.session(use_gpu=True):
-      x = np.array([True, False, True], dtype=np.bool)
-      v_tf = array_ops.broadcast_to(constant_op.constant(x), [3, 3])
-      v_np = np.broadcast_to(x, [3, 3])
-      self.assertAllEqual(v_tf.eval(), v_np)
+  def _assertBroadcastGradient(self, x, output_shape):
+    """Checks the gradient of `2 * broadcast_to(x, output_shape)` analytically.
+
+    Every input element is replicated the same number of times, so its
+    gradient is `2 * prod(output_shape) / prod(x.shape)`. This avoids the
+    per-element forward passes of the numeric Jacobian.
+    """
+    out = 2 * array_ops.broadcast_to(x, output_shape)
+    grad = gradients_impl.gradients(out, x)[0]
+    x_shape = x.get_shape().as_list()
+    expected = np.full(
+        x_shape, 2. * np.prod(output_shape) / np.prod(x_shape),
+        dtype=np.float32)
+    self.assertAllClose(self.evaluate(grad), expected)
+
+  @test_util.run_in_graph_and_eager_modes
+  def testBroadcastToBasic(self):
+    # All cases share a single output shape tensor.
+    shape = constant_op.constant([3, 3], dtype=dtypes.int32)
+    v_tfs = []
+    v_nps = []
+    for values, case_dtypes in _BASIC_CASES:
+      # Broadcast the reference once and cast it per dtype.
+      base_np = np.broadcast_to(np.array(values), [3, 3])
+      for dtype in case_dtypes:
+        x = constant_op.constant(values, dtype=dtype)
+        v_tfs.append(array_ops.broadcast_to(x, shape))
+        v_nps.append(base_np.astype(dtype.as_numpy_dtype, copy=False))
+    # Fetch every case in a single evaluate to avoid per-case session setup.
+    for v_tf, v_np in zip(self.evaluate(v_tfs), v_nps):
+      self.assertAllEqual(v_tf, v_np)
 
   @test_util.run_deprecated_v1
   def testBroadcastToShape(self):
+    cases = []
     for input_dim in range(1, 6):
       for output_dim in range(input_dim, 6):
-        with self.cached_session(use_gpu=True):
-          input_shape = [2] * input_dim
-          output_shape = [2] * output_dim
-          x = np.array(np.random.randint(5, size=input_shape), dtype=np.int32)
-          v_tf = array_ops.broadcast_to(constant_op.constant(x), output_shape)
-          v_np = np.broadcast_to(x, output_shape)
-          self.assertAllEqual(v_tf.eval(), v_np)
-
-  @test_util.run_deprecated_v1
+        input_shape = [2] * input_dim
+        output_shape = [2] * output_dim
+        x = _RNG.randint(5, size=input_shape, dtype=np.int32)
+        cases.append((x, output_shape, np.broadcast_to(x, output_shape)))
+    with self.cached_session(use_gpu=True) as sess:
+      v_tfs = [array_ops.broadcast_to(constant_op.constant(x), output_shape)
+               for x, output_shape, _ in cases]
+      for v_tf, (_, _, v_np) in zip(sess.run(v_tfs), cases):
+        self.assertAllEqual(v_tf, v_np)
+
+  @test_util.run_in_graph_and_eager_modes
   def testBroadcastToShapeInnerDim(self):
     input_shape = [2, 1, 3]
     output_shape = [2, 5, 3]
-    with self.cached_session(use_gpu=True):
-      x = np.array(np.random.randint(5, size=input_shape), dtype=np.int32)
-      v_tf = array_ops.broadcast_to(constant_op.constant(x), output_shape)
-      v_np = np.broadcast_to(x, output_shape)
-      self.assertAllEqual(v_tf.eval(), v_np)
+    x = _RNG.randint(5, size=input_shape, dtype=np.int32)
+    v_tf = array_ops.broadcast_to(constant_op.constant(x), output_shape)
+    v_np = np.broadcast_to(x, output_shape)
+    self.assertAllEqual(self.evaluate(v_tf), v_np)
 
-  @test_util.run_deprecated_v1
+  @test_util.run_in_graph_and_eager_modes
   def testBroadcastToShapeLargerDim(self):
     input_shape = [2, 1, 3, 2, 2, 2]
     output_shape = [1, 1, 1, 1, 1, 1, 1, 1, 1, 2, 15, 3, 2, 2, 2]
-    with self.cached_session(use_gpu=True):
-      x = np.array(np.random.randint(5, size=input_shape), dtype=np.int32)
-      v_tf = array_ops.broadcast_to(constant_op.constant(x), output_shape)
-      v_np = np.broadcast_to(x, output_shape)
-      self.assertAllEqual(v_tf.eval(), v_np)
+    x = _RNG.randint(5, size=input_shape, dtype=np.int32)
+    v_tf = array_ops.broadcast_to(constant_op.constant(x), output_shape)
+    v_np = np.broadcast_to(x, output_shape)
+    self.assertAllEqual(self.evaluate(v_tf), v_np)
 
-  @test_util.run_deprecated_v1
+  @test_util.run_in_graph_and_eager_modes
   def testBroadcastToShapeLargerDim2(self):
     input_shape = [2, 1, 3, 2, 2, 2, 1, 1, 1]
     output_shape = [1, 1, 1, 2, 5, 3, 2, 2, 2, 3, 3, 3]
-    with self.cached_session(use_gpu=True):
-      x = np.array(np.random.randint(5, size=input_shape), dtype=np.int32)
-      v_tf = array_ops.broadcast_to(constant_op.constant(x), output_shape)
-      v_np = np.broadcast_to(x, output_shape)
-      self.assertAllEqual(v_tf.eval(), v_np)
+    x = _RNG.randint(5, size=input_shape, dtype=np.int32)
+    v_tf = array_ops.broadcast_to(constant_op.constant(x), output_shape)
+    v_np = np.broadcast_to(x, output_shape)
+    self.assertAllEqual(self.evaluate(v_tf), v_np)
 
-  @test_util.run_deprecated_v1
+  @test_util.run_in_graph_and_eager_modes
   def testBroadcastToScalar(self):
-    with self.session(use_gpu=True):
-      x = np.array(1, dtype=np.int32)
-      v_tf = array_ops.broadcast_to(constant_op.constant(x), [3, 3])
-      v_np = np.broadcast_to(x, [3, 3])
-      self.assertAllEqual(v_tf.eval(), v_np)
-
-  @test_util.run_deprecated_v1
+    x = np.array(1, dtype=np.int32)
+    v_tf = array_ops.broadcast_to(constant_op.constant(x), [3, 3])
+    v_np = np.broadcast_to(x, [3, 3])
+    self.assertAllEqual(self.evaluate(v_tf), v_np)
+    # Broadcasting a scalar is equivalent to filling a constant of that shape.
+    v_fill = constant_op.constant(1, dtype=dtypes.int32, shape=[3, 3])
+    self.assertAllEqual(self.evaluate(v_fill), v_np)
+
+  @test_util.run_in_graph_and_eager_modes
   def testBroadcastScalarToNonScalar(self):
-    with self.session(use_gpu=True):
-      x = np.array(1.0, dtype=np.float)
-      v_tf = array_ops.broadcast_to(constant_op.constant(1.0), [2, 3, 4,
-                                                                1, 1, 1])
-      v_np = np.broadcast_to(x, [2, 3, 4, 1, 1, 1])
-      self.assertAllEqual(v_tf.eval(), v_np)
+    x = np.array(1.0, dtype=np.float)
+    v_tf = array_ops.broadcast_to(constant_op.constant(1.0), [2, 3, 4,
+                                                              1, 1, 1])
+    v_np = np.broadcast_to(x, [2, 3, 4, 1, 1, 1])
+    self.assertAllEqual(self.evaluate(v_tf), v_np)
 
+  @parameterized.parameters(dtypes.int32, dtypes.int64)
   @test_util.run_deprecated_v1
-  def testBroadcastToShapeTypeAndInference(self):
-    for dtype in [dtypes.int32, dtypes.int64]:
-      with self.cached_session(use_gpu=True):
-        x = np.array([1, 2, 3])
-        v_tf = array_ops.broadcast_to(
-            constant_op.constant(x),
-            constant_op.constant([3, 3], dtype=dtype))
-        shape = v_tf.get_shape().as_list()
-        v_np = np.broadcast_to(x, [3, 3])
-        self.assertAllEqual(v_tf.eval(), v_np)
-        # check shape inference when shape input is constant
-        self.assertAllEqual(shape, v_np.shape)
+  def testBroadcastToShapeTypeAndInference(self, dtype):
+    with self.cached_session(use_gpu=True) as sess:
+      x = np.array([1, 2, 3])
+      v_tf = array_ops.broadcast_to(
+          constant_op.constant(x),
+          constant_op.constant([3, 3], dtype=dtype))
+      shape = v_tf.get_shape().as_list()
+      v_np = np.broadcast_to(x, [3, 3])
+      self.assertAllEqual(sess.run(v_tf), v_np)
+      # check shape inference when shape input is constant
+      self.assertAllEqual(shape, v_np.shape)
 
   def testBroadcastToBadOutputShape(self):
     with context.eager_mode():
@@ -139,58 +159,44 @@ class BroadcastToTest(test_util.TensorFlowTestCase):
 
   @test_util.run_deprecated_v1
   def testGradientForScalar(self):
-    x = constant_op.constant(1, dtype=dtypes.float32)
-    v = array_ops.broadcast_to(x, [2, 4, 3])
-    out = 2 * v
-    with self.cached_session():
-      err = gradient_checker.compute_gradient_error(x, x.get_shape(), out,
-                                                    out.get_shape())
-    self.assertLess(err, 1e-4)
+    with self.cached_session(use_gpu=True):
+      x = constant_op.constant(1, dtype=dtypes.float32)
+      self._assertBroadcastGradient(x, [2, 4, 3])
 
   @test_util.run_deprecated_v1
   def testGradientWithSameRank(self):
-    x = constant_op.constant(np.reshape(np.arange(6), (2, 1, 3)),
-                             dtype=dtypes.float32)
-    v = array_ops.broadcast_to(x, [2, 5, 3])
-    out = 2 * v
-    with self.cached_session():
-      err = gradient_checker.compute_gradient_error(x, x.get_shape(),
-                                                    out, out.get_shape())
-    self.assertLess(err, 1e-4)
+    with self.cached_session(use_gpu=True):
+      x = constant_op.constant(np.arange(6, dtype=np.float32).reshape(2, 1, 3))
+      self._assertBroadcastGradient(x, [2, 5, 3])
 
   @test_util.run_deprecated_v1
   def testGradientWithIncreasingRank(self):
-    x = constant_op.constant([[1], [2]],
-                             dtype=dtypes.float32)
-    v = array_ops.broadcast_to(x, [5, 2, 3])
-    out = 2 * v
-    with self.cached_session():
-      err = gradient_checker.compute_gradient_error(x, x.get_shape(),
-                                                    out, out.get_shape())
-    self.assertLess(err, 1e-4)
+    with self.cached_session(use_gpu=True):
+      x = constant_op.constant([[1], [2]],
+                               dtype=dtypes.float32)
+      self._assertBroadcastGradient(x, [5, 2, 3])
 
   @test_util.run_deprecated_v1
   def testGradientWithBroadcastAllDimensions(self):
-    x = constant_op.constant([1], dtype=dtypes.float32)
-    v = array_ops.broadcast_to(x, [5, 2, 3])
-    out = 2 * v
-    with self.cached_session():
-      err = gradient_checker.compute_gradient_error(x, x.get_shape(),
-                                                    out, out.get_shape())
+    def func(x):
+      return 2 * array_ops.broadcast_to(x, [5, 2, 3])
+
+    x = np.array([1], dtype=np.float32)
+    with self.cached_session(use_gpu=True):
+      theoretical, numerical = gradient_checker_v2.compute_gradient(func, [x])
+    # The exact Jacobian is all 2s, so check the theoretical one against it.
+    self.assertAllEqual(theoretical[0], np.full((1, 30), 2., dtype=np.float32))
+    err = gradient_checker_v2.max_error(theoretical, numerical)
     self.assertLess(err, 1e-4)
 
   @test_util.run_deprecated_v1
   def testGradientWithLargeDim(self):
     input_shape = [2, 1, 3, 2, 2, 2, 1, 1, 1]
     output_shape = [1, 1, 1, 2, 5, 3, 2, 2, 2, 3, 3, 3]
-    x = constant_op.constant(np.array(np.random.randn(*input_shape),
-                                      dtype=np.float32))
-    v = array_ops.broadcast_to(x, output_shape)
-    out = 2 * v
-    with self.cached_session():
-      err = gradient_checker.compute_gradient_error(x, x.get_shape(),
-                                                    out, out.get_shape())
-    self.assertLess(err, 1e-4)
+    with self.cached_session(use_gpu=True):
+      x = constant_op.constant(np.array(_RNG.randn(*input_shape),
+                                        dtype=np.float32))
+      self._assertBroadcastGradient(x, output_shape)
 
 if __name__ == "__main__":
   test_lib.main()
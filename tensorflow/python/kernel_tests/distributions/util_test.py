@@ -51,9 +51,21 @@ def try_import(name):  # pylint: disable=invalid-name
 
 special = try_import("scipy.special")
 
+# Inputs for the softplus_inverse gradient tests. The wide range contains both
+# zero and inf in float16; the narrow range, and its reciprocal, are finite.
+_LOGSPACE_WIDE = np.logspace(-8, 6).astype(np.float16)
+_LOGSPACE_FINITE = np.logspace(-4.8, 4.5).astype(np.float16)
+
+
+def _trues(shape):
+  """Returns a read-only all-`True` array of `shape` without allocating it."""
+  return np.broadcast_to(True, shape)
+
 
 def _logit(x):
   x = np.asarray(x)
+  if special is not None:
+    return special.logit(x)
   return np.log(x) - np.log1p(-x)
 
 
@@ -70,24 +82,23 @@ class AssertCloseTest(test.TestCase):
     w = array_ops.placeholder(dtypes.float32)
     feed_dict = {x: [1., 5, 10, 15, 20], y: [1.1, 5, 10, 15, 20],
                  z: [1.0001, 5, 10, 15, 20], w: [1e-8, 5, 10, 15, 20]}
-    with self.cached_session():
-      with ops.control_dependencies([du.assert_integer_form(x)]):
-        array_ops.identity(x).eval(feed_dict=feed_dict)
+    # Build every checked identity up front so the graph is constructed once
+    # and only evaluated per assertion.
+    checked = {}
+    for v in (x, y, z, w):
+      with ops.control_dependencies([du.assert_integer_form(v)]):
+        checked[v] = array_ops.identity(v)
+    with self.cached_session() as sess:
+      sess.run(checked[x], feed_dict=feed_dict)
 
       with self.assertRaisesOpError("has non-integer components"):
-        with ops.control_dependencies(
-            [du.assert_integer_form(y)]):
-          array_ops.identity(y).eval(feed_dict=feed_dict)
+        sess.run(checked[y], feed_dict=feed_dict)
 
       with self.assertRaisesOpError("has non-integer components"):
-        with ops.control_dependencies(
-            [du.assert_integer_form(z)]):
-          array_ops.identity(z).eval(feed_dict=feed_dict)
+        sess.run(checked[z], feed_dict=feed_dict)
 
       with self.assertRaisesOpError("has non-integer components"):
-        with ops.control_dependencies(
-            [du.assert_integer_form(w)]):
-          array_ops.identity(w).eval(feed_dict=feed_dict)
+        sess.run(checked[w], feed_dict=feed_dict)
 
 
 class MaybeGetStaticTest(test.TestCase):
@@ -381,105 +392,51 @@ class DynamicShapeTest(test.TestCase):
 
   @test_util.run_deprecated_v1
   def testSameDynamicShape(self):
-    with self.cached_session():
-      scalar = constant_op.constant(2.0)
-      scalar1 = array_ops.placeholder(dtype=dtypes.float32)
-
-      vector = [0.3, 0.4, 0.5]
-      vector1 = array_ops.placeholder(dtype=dtypes.float32, shape=[None])
-      vector2 = array_ops.placeholder(dtype=dtypes.float32, shape=[None])
-
-      multidimensional = [[0.3, 0.4], [0.2, 0.6]]
-      multidimensional1 = array_ops.placeholder(
-          dtype=dtypes.float32, shape=[None, None])
-      multidimensional2 = array_ops.placeholder(
-          dtype=dtypes.float32, shape=[None, None])
-
-      # Scalar
-      self.assertTrue(
-          du.same_dynamic_shape(scalar, scalar1).eval({
-              scalar1: 2.0
-          }))
-
-      # Vector
-
-      self.assertTrue(
-          du.same_dynamic_shape(vector, vector1).eval({
-              vector1: [2.0, 3.0, 4.0]
-          }))
-      self.assertTrue(
-          du.same_dynamic_shape(vector1, vector2).eval({
-              vector1: [2.0, 3.0, 4.0],
-              vector2: [2.0, 3.5, 6.0]
-          }))
-
-      # Multidimensional
-      self.assertTrue(
-          du.same_dynamic_shape(
-              multidimensional, multidimensional1).eval({
-                  multidimensional1: [[2.0, 3.0], [3.0, 4.0]]
-              }))
-      self.assertTrue(
-          du.same_dynamic_shape(
-              multidimensional1, multidimensional2).eval({
-                  multidimensional1: [[2.0, 3.0], [3.0, 4.0]],
-                  multidimensional2: [[1.0, 3.5], [6.3, 2.3]]
-              }))
-
-      # Scalar, X
-      self.assertFalse(
-          du.same_dynamic_shape(scalar, vector1).eval({
-              vector1: [2.0, 3.0, 4.0]
-          }))
-      self.assertFalse(
-          du.same_dynamic_shape(scalar1, vector1).eval({
-              scalar1: 2.0,
-              vector1: [2.0, 3.0, 4.0]
-          }))
-      self.assertFalse(
-          du.same_dynamic_shape(scalar, multidimensional1).eval({
-              multidimensional1: [[2.0, 3.0], [3.0, 4.0]]
-          }))
-      self.assertFalse(
-          du.same_dynamic_shape(scalar1, multidimensional1).eval(
-              {
-                  scalar1: 2.0,
-                  multidimensional1: [[2.0, 3.0], [3.0, 4.0]]
-              }))
-
-      # Vector, X
-      self.assertFalse(
-          du.same_dynamic_shape(vector, vector1).eval({
-              vector1: [2.0, 3.0]
-          }))
-      self.assertFalse(
-          du.same_dynamic_shape(vector1, vector2).eval({
-              vector1: [2.0, 3.0, 4.0],
-              vector2: [6.0]
-          }))
-      self.assertFalse(
-          du.same_dynamic_shape(vector, multidimensional1).eval({
-              multidimensional1: [[2.0, 3.0], [3.0, 4.0]]
-          }))
-      self.assertFalse(
-          du.same_dynamic_shape(vector1, multidimensional1).eval(
-              {
-                  vector1: [2.0, 3.0, 4.0],
-                  multidimensional1: [[2.0, 3.0], [3.0, 4.0]]
-              }))
-
-      # Multidimensional, X
-      self.assertFalse(
-          du.same_dynamic_shape(
-              multidimensional, multidimensional1).eval({
-                  multidimensional1: [[1.0, 3.5, 5.0], [6.3, 2.3, 7.1]]
-              }))
-      self.assertFalse(
-          du.same_dynamic_shape(
-              multidimensional1, multidimensional2).eval({
-                  multidimensional1: [[2.0, 3.0], [3.0, 4.0]],
-                  multidimensional2: [[1.0, 3.5, 5.0], [6.3, 2.3, 7.1]]
-              }))
+    scalar = constant_op.constant(2.0)
+    vector = [0.3, 0.4, 0.5]
+    multidimensional = [[0.3, 0.4], [0.2, 0.6]]
+
+    # Every dynamic operand gets its own placeholder so that all comparisons
+    # can be fetched in a single run with one merged feed.
+    feed_dict = {}
+
+    def fed(value, shape=None):
+      x = array_ops.placeholder(dtype=dtypes.float32, shape=shape)
+      feed_dict[x] = value
+      return x
+
+    cases = [
+        # Scalar
+        (scalar, fed(2.0), True),
+        # Vector
+        (vector, fed([2.0, 3.0, 4.0], [None]), True),
+        (fed([2.0, 3.0, 4.0], [None]), fed([2.0, 3.5, 6.0], [None]), True),
+        # Multidimensional
+        (multidimensional, fed([[2.0, 3.0], [3.0, 4.0]], [None, None]), True),
+        (fed([[2.0, 3.0], [3.0, 4.0]], [None, None]),
+         fed([[1.0, 3.5], [6.3, 2.3]], [None, None]), True),
+        # Scalar, X
+        (scalar, fed([2.0, 3.0, 4.0], [None]), False),
+        (fed(2.0), fed([2.0, 3.0, 4.0], [None]), False),
+        (scalar, fed([[2.0, 3.0], [3.0, 4.0]], [None, None]), False),
+        (fed(2.0), fed([[2.0, 3.0], [3.0, 4.0]], [None, None]), False),
+        # Vector, X
+        (vector, fed([2.0, 3.0], [None]), False),
+        (fed([2.0, 3.0, 4.0], [None]), fed([6.0], [None]), False),
+        (vector, fed([[2.0, 3.0], [3.0, 4.0]], [None, None]), False),
+        (fed([2.0, 3.0, 4.0], [None]),
+         fed([[2.0, 3.0], [3.0, 4.0]], [None, None]), False),
+        # Multidimensional, X
+        (multidimensional,
+         fed([[1.0, 3.5, 5.0], [6.3, 2.3, 7.1]], [None, None]), False),
+        (fed([[2.0, 3.0], [3.0, 4.0]], [None, None]),
+         fed([[1.0, 3.5, 5.0], [6.3, 2.3, 7.1]], [None, None]), False),
+    ]
+    with self.cached_session() as sess:
+      actual = sess.run([du.same_dynamic_shape(a, b) for a, b, _ in cases],
+                        feed_dict=feed_dict)
+    for (_, _, expected), actual_ in zip(cases, actual):
+      self.assertEqual(expected, actual_)
 
 
 class RotateTransposeTest(test.TestCase):
@@ -497,11 +454,13 @@ class RotateTransposeTest(test.TestCase):
       error_message = "None values not supported."
     with self.assertRaisesRegexp(ValueError, error_message):
       du.rotate_transpose(None, 1)
+    shifts = np.arange(-5, 5)
     for x in (np.ones(1), np.ones((2, 1)), np.ones((3, 2, 1))):
-      for shift in np.arange(-5, 5):
-        y = du.rotate_transpose(x, shift)
-        self.assertAllEqual(
-            self._np_rotate_transpose(x, shift), self.evaluate(y))
+      ys = [du.rotate_transpose(x, shift) for shift in shifts]
+      # Evaluate every shift for this shape in a single call.
+      ys_ = self.evaluate(ys)
+      for shift, y, y_ in zip(shifts, ys, ys_):
+        self.assertAllEqual(self._np_rotate_transpose(x, shift), y_)
         self.assertAllEqual(np.roll(x.shape, shift), y.get_shape().as_list())
 
   @test_util.run_deprecated_v1
@@ -509,6 +468,8 @@ class RotateTransposeTest(test.TestCase):
     with self.cached_session() as sess:
       x = array_ops.placeholder(dtypes.float32)
       shift = array_ops.placeholder(dtypes.int32)
+      # Build the op once; only the fed values change across iterations.
+      y = du.rotate_transpose(x, shift)
       for x_value in (np.ones(
           1, dtype=x.dtype.as_numpy_dtype()), np.ones(
               (2, 1), dtype=x.dtype.as_numpy_dtype()), np.ones(
@@ -516,9 +477,7 @@ class RotateTransposeTest(test.TestCase):
         for shift_value in np.arange(-5, 5):
           self.assertAllEqual(
               self._np_rotate_transpose(x_value, shift_value),
-              sess.run(du.rotate_transpose(x, shift),
-                       feed_dict={x: x_value,
-                                  shift: shift_value}))
+              sess.run(y, feed_dict={x: x_value, shift: shift_value}))
 
 
 class PickVectorTest(test.TestCase):
@@ -920,63 +879,64 @@ class SoftplusTest(test.TestCase):
     zero = np.asarray(0).astype(np_features.dtype)
     return np.logaddexp(zero, np_features)
 
-  def _testSoftplus(self, np_features, use_gpu=False):
-    np_features = np.asarray(np_features)
-    np_softplus = self._npSoftplus(np_features)
-    with self.session(use_gpu=use_gpu) as sess:
-      softplus = nn_ops.softplus(np_features)
-      softplus_inverse = du.softplus_inverse(softplus)
-      [tf_softplus, tf_softplus_inverse] = sess.run([
-          softplus, softplus_inverse])
-    self.assertAllCloseAccordingToType(np_softplus, tf_softplus)
-    rtol = {"float16": 0.07, "float32": 0.003, "float64": 0.002}.get(
-        str(np_features.dtype), 1e-6)
-    # This will test that we correctly computed the inverse by verifying we
-    # recovered the original input.
-    self.assertAllCloseAccordingToType(
-        np_features, tf_softplus_inverse,
-        atol=0., rtol=rtol)
-    self.assertAllEqual(np.ones_like(tf_softplus).astype(np.bool),
-                        tf_softplus > 0)
-
-    self.assertShapeEqual(np_softplus, softplus)
-    self.assertShapeEqual(np_softplus, softplus_inverse)
-
-    self.assertAllEqual(np.ones_like(tf_softplus).astype(np.bool),
-                        np.isfinite(tf_softplus))
-    self.assertAllEqual(np.ones_like(tf_softplus_inverse).astype(np.bool),
-                        np.isfinite(tf_softplus_inverse))
+  def _testSoftplus(self, np_features_list, use_gpu=False):
+    """Checks softplus and its inverse for every input in one session run."""
+    np_features_list = [np.asarray(f) for f in np_features_list]
+    with self.cached_session(use_gpu=use_gpu) as sess:
+      softpluses = [nn_ops.softplus(f) for f in np_features_list]
+      softplus_inverses = [du.softplus_inverse(s) for s in softpluses]
+      [tf_softpluses, tf_softplus_inverses] = sess.run([
+          softpluses, softplus_inverses])
+    for (np_features, softplus, softplus_inverse, tf_softplus,
+         tf_softplus_inverse) in zip(np_features_list, softpluses,
+                                     softplus_inverses, tf_softpluses,
+                                     tf_softplus_inverses):
+      np_softplus = self._npSoftplus(np_features)
+      self.assertAllCloseAccordingToType(np_softplus, tf_softplus)
+      rtol = {"float16": 0.07, "float32": 0.003, "float64": 0.002}.get(
+          str(np_features.dtype), 1e-6)
+      # This will test that we correctly computed the inverse by verifying we
+      # recovered the original input.
+      self.assertAllCloseAccordingToType(
+          np_features, tf_softplus_inverse,
+          atol=0., rtol=rtol)
+      self.assertAllEqual(_trues(tf_softplus.shape),
+                          tf_softplus > 0)
+
+      self.assertShapeEqual(np_softplus, softplus)
+      self.assertShapeEqual(np_softplus, softplus_inverse)
+
+      self.assertAllEqual(_trues(tf_softplus.shape),
+                          np.isfinite(tf_softplus))
+      self.assertAllEqual(_trues(tf_softplus_inverse.shape),
+                          np.isfinite(tf_softplus_inverse))
 
   @test_util.run_deprecated_v1
   def testNumbers(self):
+    cpu_features = []
+    gpu_features = []
     for t in [np.float16, np.float32, np.float64]:
       lower = {np.float16: -15, np.float32: -50, np.float64: -50}.get(t, -100)
       upper = {np.float16: 50, np.float32: 50, np.float64: 50}.get(t, 100)
-      self._testSoftplus(
-          np.array(np.linspace(lower, upper, int(1e3)).astype(t)).reshape(
-              [2, -1]),
-          use_gpu=False)
-      self._testSoftplus(
-          np.array(np.linspace(lower, upper, int(1e3)).astype(t)).reshape(
-              [2, -1]),
-          use_gpu=True)
+      features = np.linspace(lower, upper, int(1e3)).astype(t).reshape([2, -1])
+      cpu_features.append(features)
+      gpu_features.append(features)
       log_eps = np.log(np.finfo(t).eps)
       one = t(1)
       ten = t(10)
-      self._testSoftplus(
-          [
-              log_eps, log_eps - one, log_eps + one, log_eps - ten,
-              log_eps + ten, -log_eps, -log_eps - one, -log_eps + one,
-              -log_eps - ten, -log_eps + ten
-          ],
-          use_gpu=False)
-      self._testSoftplus(
-          [
-              log_eps, log_eps - one, log_eps + one, log_eps - ten,
-              log_eps + ten - log_eps, -log_eps - one, -log_eps + one,
-              -log_eps - ten, -log_eps + ten
-          ],
-          use_gpu=True)
+      cpu_features.append([
+          log_eps, log_eps - one, log_eps + one, log_eps - ten,
+          log_eps + ten, -log_eps, -log_eps - one, -log_eps + one,
+          -log_eps - ten, -log_eps + ten
+      ])
+      gpu_features.append([
+          log_eps, log_eps - one, log_eps + one, log_eps - ten,
+          log_eps + ten - log_eps, -log_eps - one, -log_eps + one,
+          -log_eps - ten, -log_eps + ten
+      ])
+    # All dtypes are checked with a single run per device.
+    self._testSoftplus(cpu_features, use_gpu=False)
+    self._testSoftplus(gpu_features, use_gpu=True)
 
   @test_util.run_deprecated_v1
   def testGradient(self):
@@ -999,7 +959,7 @@ class SoftplusTest(test.TestCase):
   def testInverseSoftplusGradientNeverNan(self):
     with self.cached_session():
       # Note that this range contains both zero and inf.
-      x = constant_op.constant(np.logspace(-8, 6).astype(np.float16))
+      x = constant_op.constant(_LOGSPACE_WIDE)
       y = du.softplus_inverse(x)
       grads = self.evaluate(gradients_impl.gradients(y, x)[0])
       # Equivalent to `assertAllFalse` (if it existed).
@@ -1010,7 +970,7 @@ class SoftplusTest(test.TestCase):
     with self.cached_session():
       # This range of x is all finite, and so is 1 / x.  So the
       # gradient and its approximations should be finite as well.
-      x = constant_op.constant(np.logspace(-4.8, 4.5).astype(np.float16))
+      x = constant_op.constant(_LOGSPACE_FINITE)
       y = du.softplus_inverse(x)
       grads = self.evaluate(gradients_impl.gradients(y, x)[0])
       # Equivalent to `assertAllTrue` (if it existed).
@@ -305,6 +305,90 @@ class RNNTest(test.TestCase):
     self.assertAllEqual(4, state[0])
     self.assertAllEqual([[[1]], [[2]], [[3]], [[4]]], state[1])
 
+  # The tests above use lengths that cover every step, which dynamic_rnn runs
+  # without masking. The variants below keep one sequence shorter so the
+  # masked copy in _rnn_step still runs.
+
+  @test_util.run_in_graph_and_eager_modes
+  def testScalarStateIsAcceptedWithMaskedSteps(self):
+    cell = ScalarStateRNNCell()
+    in_eager_mode = context.executing_eagerly()
+    values = [[[1], [2], [3], [4]], [[5], [6], [7], [8]]]
+
+    if in_eager_mode:
+      inputs = np.array(values, dtype=np.float32)
+    else:
+      inputs = array_ops.placeholder(dtypes.float32, shape=(2, 4, 1))
+
+    with self.cached_session(use_gpu=True) as sess:
+      outputs, state = rnn.dynamic_rnn(
+          cell, inputs, dtype=dtypes.float32, sequence_length=[4, 3])
+      if not in_eager_mode:
+        outputs, state = sess.run([outputs, state], feed_dict={inputs: values})
+
+    self.assertAllEqual([[[1], [2], [3], [4]], [[5], [6], [7], [0]]], outputs)
+    # Scalar state is passed through unmasked.
+    self.assertAllEqual(4, state)
+
+  @test_util.run_in_graph_and_eager_modes
+  def testUnbalancedOutputIsAcceptedWithMaskedSteps(self):
+    cell = UnbalancedOutputRNNCell()
+    in_eager_mode = context.executing_eagerly()
+    values = [[[1], [2], [3], [4]], [[5], [6], [7], [8]]]
+
+    if in_eager_mode:
+      inputs = np.array(values, dtype=np.float32)
+    else:
+      inputs = array_ops.placeholder(dtypes.float32, shape=(2, 4, 1))
+
+    with self.cached_session(use_gpu=True) as sess:
+      outputs, state = rnn.dynamic_rnn(
+          cell, inputs, dtype=dtypes.float32, sequence_length=[4, 3])
+      if not in_eager_mode:
+        outputs, state = sess.run([outputs, state], feed_dict={inputs: values})
+
+    self.assertIsInstance(outputs, tuple)
+    self.assertAllEqual([[[1], [2], [3], [4]], [[5], [6], [7], [0]]],
+                        outputs[0])
+    self.assertAllEqual(
+        [[[1, 1], [2, 2], [3, 3], [4, 4]], [[5, 5], [6, 6], [7, 7], [0, 0]]],
+        outputs[1])
+    self.assertAllEqual(4, state)
+
+  @test_util.assert_no_new_pyobjects_executing_eagerly
+  def testEagerMemoryWithMaskedSteps(self):
+    with context.eager_mode():
+      cell = TensorArrayStateRNNCell()
+      inputs = np.array([[[1], [2], [3], [4]], [[5], [6], [7], [8]]],
+                        dtype=np.float32)
+      rnn.dynamic_rnn(
+          cell, inputs, dtype=dtypes.float32, sequence_length=[4, 3])
+
+  @test_util.run_in_graph_and_eager_modes
+  @test_util.run_v1_only("b/120545219")
+  def testTensorArrayStateIsAcceptedWithMaskedSteps(self):
+    cell = TensorArrayStateRNNCell()
+    in_eager_mode = context.executing_eagerly()
+    values = [[[1], [2], [3], [4]], [[5], [6], [7], [8]]]
+
+    if in_eager_mode:
+      inputs = np.array(values, dtype=np.float32)
+    else:
+      inputs = array_ops.placeholder(dtypes.float32, shape=(2, 4, 1))
+
+    with self.cached_session(use_gpu=True) as sess:
+      outputs, state = rnn.dynamic_rnn(
+          cell, inputs, dtype=dtypes.float32, sequence_length=[4, 3])
+      state = (state[0], state[1].stack())
+      if not in_eager_mode:
+        outputs, state = sess.run([outputs, state], feed_dict={inputs: values})
+
+    self.assertAllEqual([[[1], [2], [3], [4]], [[5], [6], [7], [0]]], outputs)
+    # The scalar counter and the TensorArray are passed through unmasked.
+    self.assertAllEqual(4, state[0])
+    self.assertAllEqual([[[1], [5]], [[2], [6]], [[3], [7]], [[4], [8]]],
+                        state[1])
+
   @test_util.run_deprecated_v1
   def testCellGetInitialState(self):
     cell = rnn_cell_impl.BasicRNNCell(5)
@@ -549,6 +633,66 @@ class RNNTest(test.TestCase):
       self.assertEqual(len(outputs[0]), batch)
       self.assertEqual(len(state), batch)
 
+  @test_util.run_deprecated_v1
+  def testDynamicRNNSkipsMaskingForFullStaticSequenceLength(self):
+    cell = Plus1RNNCell()
+    inputs = array_ops.placeholder(dtypes.float32, shape=(2, 3, 5))
+    outputs, state = rnn.dynamic_rnn(
+        cell, inputs, dtype=dtypes.float32, sequence_length=[3, 3])
+    op_types = set(
+        op.type for op in ops_lib.get_default_graph().get_operations())
+    self.assertFalse(op_types & {"Select", "SelectV2"})
+    with self.cached_session() as sess:
+      outputs, state = sess.run(
+          [outputs, state], feed_dict={inputs: np.ones((2, 3, 5))})
+    self.assertAllEqual(np.full((2, 3, 5), 2.), outputs)
+    self.assertAllEqual(np.full((2, 5), 3.), state)
+
+  @test_util.run_deprecated_v1
+  def testDynamicRNNFullStaticSequenceLengthStillChecksBatchSize(self):
+    cell = Plus1RNNCell()
+    # Dynamic batch size: the lengths are only checked at run time.
+    inputs = array_ops.placeholder(dtypes.float32, shape=(None, 3, 5))
+    outputs, _ = rnn.dynamic_rnn(
+        cell, inputs, dtype=dtypes.float32, sequence_length=[3, 3])
+    with self.cached_session() as sess:
+      with self.assertRaisesOpError("Expected shape for Tensor"):
+        sess.run(outputs, feed_dict={inputs: np.ones((4, 3, 5))})
+    # Static batch size with a length vector of the wrong size.
+    inputs = array_ops.placeholder(dtypes.float32, shape=(2, 3, 5))
+    outputs, _ = rnn.dynamic_rnn(
+        cell, inputs, dtype=dtypes.float32, sequence_length=[3])
+    with self.cached_session() as sess:
+      with self.assertRaisesOpError("Expected shape for Tensor"):
+        sess.run(outputs, feed_dict={inputs: np.ones((2, 3, 5))})
+
+  @test_util.run_deprecated_v1
+  def testStaticRNNSkipsStepsPastStaticMaxSequenceLength(self):
+    cell = Plus1RNNCell()
+    inputs = [
+        array_ops.placeholder(dtypes.float32, shape=(2, 5)) for _ in range(4)
+    ]
+    outputs, state = rnn.static_rnn(
+        cell, inputs, dtype=dtypes.float32, sequence_length=[1, 2])
+    # Only the first two steps build cell ops, so the later inputs are unused
+    # and have no gradient.
+    self.assertEqual([], inputs[2].consumers())
+    self.assertEqual([], inputs[3].consumers())
+    grads = gradients_impl.gradients(outputs[:2] + [state], inputs)
+    self.assertIsNotNone(grads[0])
+    self.assertIsNotNone(grads[1])
+    self.assertIsNone(grads[2])
+    self.assertIsNone(grads[3])
+    with self.cached_session() as sess:
+      outputs, state = sess.run(
+          [outputs, state],
+          feed_dict={input_: np.ones((2, 5)) for input_ in inputs})
+    self.assertAllEqual([[2.] * 5, [2.] * 5], outputs[0])
+    self.assertAllEqual([[0.] * 5, [2.] * 5], outputs[1])
+    self.assertAllEqual(np.zeros((2, 5)), outputs[2])
+    self.assertAllEqual(np.zeros((2, 5)), outputs[3])
+    self.assertAllEqual([[1.] * 5, [2.] * 5], state)
+
   @test_util.run_deprecated_v1
   def testKerasAndTFRNNLayerOutputComparison(self):
     input_shape = 10
@@ -168,22 +168,14 @@ def _is_keras_rnn_cell(rnn_cell):
 # pylint: disable=unused-argument
 def _rnn_step(time,
               sequence_length,
-              min_sequence_length,
-              max_sequence_length,
               zero_output,
               state,
               call_cell,
-              state_size,
-              skip_conditionals=False):
+              state_size):
   """Calculate one step of a dynamic RNN minibatch.
 
-  Returns an (output, state) pair conditioned on `sequence_length`.
-  When skip_conditionals=False, the pseudocode is something like:
-
-  if t >= max_sequence_length:
-    return (zero_output, state)
-  if t < min_sequence_length:
-    return call_cell()
+  Returns an (output, state) pair conditioned on `sequence_length`. The
+  pseudocode is something like:
 
   # Selectively output zeros or output, old state or new state depending
   # on whether we've finished calculating each row.
@@ -201,8 +193,6 @@ def _rnn_step(time,
   Args:
     time: int32 `Tensor` scalar.
     sequence_length: int32 `Tensor` vector of size [batch_size].
-    min_sequence_length: int32 `Tensor` scalar, min of sequence_length.
-    max_sequence_length: int32 `Tensor` scalar, max of sequence_length.
     zero_output: `Tensor` vector of shape [output_size].
     state: Either a single `Tensor` matrix of shape `[batch_size, state_size]`,
       or a list/tuple of such tensors.
@@ -210,10 +200,6 @@ def _rnn_step(time,
       new_output is a `Tensor` matrix of shape `[batch_size, output_size]`.
       new_state is a `Tensor` matrix of shape `[batch_size, state_size]`.
     state_size: The `cell.state_size` associated with the state.
-    skip_conditionals: Python bool, whether to skip using the conditional
-      calculations.  This is useful for `dynamic_rnn`, where the input tensor
-      matches `max_sequence_length`, and using conditionals just slows
-      everything down.
 
   Returns:
     A tuple of (`final_output`, `final_state`) as given by the pseudocode above:
@@ -257,43 +243,24 @@ def _rnn_step(time,
     ]
     return flat_new_output + flat_new_state
 
-  def _maybe_copy_some_through():
-    """Run RNN step.  Pass through either no or some past state."""
-    new_output, new_state = call_cell()
-
-    nest.assert_same_structure(zero_output, new_output)
-    nest.assert_same_structure(state, new_state)
-
-    flat_new_state = nest.flatten(new_state)
-    flat_new_output = nest.flatten(new_output)
-    return control_flow_ops.cond(
-        # if t < min_seq_len: calculate and return everything
-        time < min_sequence_length,
-        lambda: flat_new_output + flat_new_state,
-        # else copy some of it through
-        lambda: _copy_some_through(flat_new_output, flat_new_state))
-
-  # TODO(ebrevdo): skipping these conditionals may cause a slowdown,
-  # but benefits from removing cond() and its gradient.  We should
-  # profile with and without this switch here.
-  if skip_conditionals:
-    # Instead of using conditionals, perform the selective copy at all time
-    # steps.  This is faster when max_seq_len is equal to the number of unrolls
-    # (which is typical for dynamic_rnn).
-    new_output, new_state = call_cell()
-    nest.assert_same_structure(zero_output, new_output)
-    nest.assert_same_structure(state, new_state)
-    new_state = nest.flatten(new_state)
-    new_output = nest.flatten(new_output)
-    final_output_and_state = _copy_some_through(new_output, new_state)
-  else:
-    empty_update = lambda: flat_zero_output + flat_state
-    final_output_and_state = control_flow_ops.cond(
-        # if t >= max_seq_len: copy all state through, output zeros
-        time >= max_sequence_length,
-        empty_update,
-        # otherwise calculation is required: copy some or all of it through
-        _maybe_copy_some_through)
+  # The cell is always called, and the selective copy is done at every time
+  # step rather than guarded by cond().
+  new_output, new_state = call_cell()
+  if not any(
+      nest.is_sequence(x)
+      for x in (zero_output, state, new_output, new_state)):
+    # Single tensor output and state: one select each, no repacking.
+    final_output = _copy_one_through(zero_output, new_output)
+    final_output.set_shape(zero_output.get_shape())
+    final_state = _copy_one_through(state, new_state)
+    if not isinstance(final_state, tensor_array_ops.TensorArray):
+      final_state.set_shape(state.get_shape())
+    return final_output, final_state
+  nest.assert_same_structure(zero_output, new_output)
+  nest.assert_same_structure(state, new_state)
+  new_state = nest.flatten(new_state)
+  new_output = nest.flatten(new_output)
+  final_output_and_state = _copy_some_through(new_output, new_state)
 
   if len(final_output_and_state) != len(flat_zero_output) + len(flat_state):
     raise ValueError("Internal error: state and output were not concatenated "
@@ -656,12 +623,26 @@ def dynamic_rnn(cell,
       flat_input = tuple(_transpose_batch_time(input_) for input_ in flat_input)
 
     parallel_iterations = parallel_iterations or 32
+    max_sequence_length = None
+    masks_outputs = sequence_length is not None
     if sequence_length is not None:
       sequence_length = math_ops.cast(sequence_length, dtypes.int32)
       if sequence_length.get_shape().rank not in (None, 1):
         raise ValueError(
             "sequence_length must be a vector of length batch_size, "
             "but saw shape: %s" % sequence_length.get_shape())
+      # Lengths known at graph construction time need no reduction op.
+      static_sequence_length = tensor_util.constant_value(sequence_length)
+      if static_sequence_length is not None and static_sequence_length.size:
+        max_sequence_length = int(static_sequence_length.max())
+        # When every sequence spans all time steps, no output or state is
+        # ever masked, so the loop can call the cell directly.
+        input_shape = tensor_shape.as_shape(flat_input[0].shape)
+        if input_shape.rank:
+          const_time_steps = tensor_shape.dimension_value(input_shape[0])
+          if (const_time_steps is not None and
+              static_sequence_length.min() >= const_time_steps):
+            masks_outputs = False
       sequence_length = array_ops.identity(  # Just to find it in the graph.
           sequence_length,
           name="sequence_length")
@@ -688,12 +669,23 @@ def dynamic_rnn(cell,
               " but saw shape: ", x_shape
           ])
 
-    if not context.executing_eagerly() and sequence_length is not None:
+    # The runtime check is redundant when the static shapes already agree.
+    if (not context.executing_eagerly() and sequence_length is not None and
+        not (isinstance(batch_size, int) and
+             sequence_length.get_shape().is_fully_defined() and
+             sequence_length.get_shape().as_list() == [batch_size])):
       # Perform some shape validation
       with ops.control_dependencies(
           [_assert_has_shape(sequence_length, [batch_size])]):
-        sequence_length = array_ops.identity(
-            sequence_length, name="CheckSeqLen")
+        if masks_outputs:
+          sequence_length = array_ops.identity(
+              sequence_length, name="CheckSeqLen")
+        else:
+          # The loop will not read sequence_length, so gate its inputs on
+          # the check instead.
+          flat_input = tuple(
+              array_ops.identity(input_, name="CheckSeqLen")
+              for input_ in flat_input)
 
     inputs = nest.pack_sequence_as(structure=inputs, flat_sequence=flat_input)
 
@@ -703,8 +695,9 @@ def dynamic_rnn(cell,
         state,
         parallel_iterations=parallel_iterations,
         swap_memory=swap_memory,
-        sequence_length=sequence_length,
-        dtype=dtype)
+        sequence_length=sequence_length if masks_outputs else None,
+        dtype=dtype,
+        max_sequence_length=max_sequence_length)
 
     # Outputs of _dynamic_rnn_loop are always shaped [time, batch, depth].
     # If we are performing batch-major calculations, transpose output back
@@ -722,7 +715,8 @@ def _dynamic_rnn_loop(cell,
                       parallel_iterations,
                       swap_memory,
                       sequence_length=None,
-                      dtype=None):
+                      dtype=None,
+                      max_sequence_length=None):
   """Internal implementation of Dynamic RNN.
 
   Args:
@@ -737,6 +731,8 @@ def _dynamic_rnn_loop(cell,
     sequence_length: (optional) An `int32` `Tensor` of shape [batch_size].
     dtype: (optional) Expected dtype of output. If not specified, inferred from
       initial_state.
+    max_sequence_length: (optional) Python int, the maximum of
+      `sequence_length` when it is known at graph construction time.
 
   Returns:
     Tuple `(final_outputs, final_state)`.
@@ -792,9 +788,13 @@ def _dynamic_rnn_loop(cell,
 
   # Prepare dynamic conditional copying of state & output
   def _create_zero_arrays(size):
-    size = _concat(batch_size, size)
-    return array_ops.zeros(
-        array_ops.stack(size), _infer_state_dtype(dtype, state))
+    static_size = _concat(batch_size, size, static=True)
+    if static_size is not None and None not in static_size:
+      # Fully known shapes give a constant instead of a runtime shape tensor.
+      size = static_size
+    else:
+      size = array_ops.stack(_concat(batch_size, size))
+    return array_ops.zeros(size, _infer_state_dtype(dtype, state))
 
   flat_zero_output = tuple(
       _create_zero_arrays(output) for output in flat_output_size)
@@ -802,8 +802,8 @@ def _dynamic_rnn_loop(cell,
       structure=cell.output_size, flat_sequence=flat_zero_output)
 
   if sequence_length is not None:
-    min_sequence_length = math_ops.reduce_min(sequence_length)
-    max_sequence_length = math_ops.reduce_max(sequence_length)
+    if max_sequence_length is None:
+      max_sequence_length = math_ops.reduce_max(sequence_length)
   else:
     max_sequence_length = time_steps
 
@@ -842,6 +842,11 @@ def _dynamic_rnn_loop(cell,
                       for i in range(len(flat_output_size)))
     input_ta = flat_input
 
+  # Resolved once here rather than in the loop body, which eager execution
+  # runs in Python on every step.
+  is_keras_rnn_cell = _is_keras_rnn_cell(cell)
+  input_is_sequence = nest.is_sequence(inputs)
+
   def _time_step(time, output_ta_t, state):
     """Take a time step of the dynamic RNN.
 
@@ -855,16 +860,18 @@ def _dynamic_rnn_loop(cell,
     """
 
     if in_graph_mode:
+      # The input TensorArrays carry the static per-step shape, so the reads
+      # come back with it already set.
       input_t = tuple(ta.read(time) for ta in input_ta)
-      # Restore some shape information
-      for input_, shape in zip(input_t, inputs_got_shape):
-        input_.set_shape(shape[1:])
     else:
-      input_t = tuple(ta[time.numpy()] for ta in input_ta)
+      time_index = time.numpy()
+      input_t = tuple(ta[time_index] for ta in input_ta)
 
-    input_t = nest.pack_sequence_as(structure=inputs, flat_sequence=input_t)
+    if input_is_sequence:
+      input_t = nest.pack_sequence_as(structure=inputs, flat_sequence=input_t)
+    else:
+      input_t = input_t[0]
     # Keras RNN cells only accept state as list, even if it's a single tensor.
-    is_keras_rnn_cell = _is_keras_rnn_cell(cell)
     if is_keras_rnn_cell and not nest.is_sequence(state):
       state = [state]
     call_cell = lambda: cell(input_t, state)
@@ -873,13 +880,10 @@ def _dynamic_rnn_loop(cell,
       (output, new_state) = _rnn_step(
           time=time,
           sequence_length=sequence_length,
-          min_sequence_length=min_sequence_length,
-          max_sequence_length=max_sequence_length,
           zero_output=zero_output,
           state=state,
           call_cell=call_cell,
-          state_size=state_size,
-          skip_conditionals=True)
+          state_size=state_size)
     else:
       (output, new_state) = call_cell()
 
@@ -894,7 +898,7 @@ def _dynamic_rnn_loop(cell,
           ta.write(time, out) for ta, out in zip(output_ta_t, output))
     else:
       for ta, out in zip(output_ta_t, output):
-        ta[time.numpy()] = out
+        ta[time_index] = out
 
     return (time + 1, output_ta_t, new_state)
 
@@ -1285,10 +1289,15 @@ def static_rnn(cell,
 
   An initial state can be provided.
   If the sequence_length vector is provided, dynamic calculation is performed.
-  This method of calculation does not compute the RNN steps past the maximum
-  sequence length of the minibatch (thus saving computational time),
-  and properly propagates the state at an example's sequence length
-  to the final state output.
+  This method of calculation properly propagates the state at an example's
+  sequence length to the final state output, and emits zeros for the outputs
+  past it. The selection is done with an unconditional masked copy at every
+  time step rather than with `cond` ops, so no per-step predicate has to be
+  evaluated. If `sequence_length` is a constant, the cell is not applied at
+  all for time steps past its maximum: those outputs are the zero output and
+  the state is carried through unchanged. The inputs at those time steps are
+  then disconnected from the result, so `tf.gradients` returns `None` for
+  them rather than zeros.
 
   The dynamic calculation performed is, at time `t` for batch row `b`,
 
@@ -1333,7 +1342,7 @@ def static_rnn(cell,
   if not inputs:
     raise ValueError("inputs must not be empty")
 
-  outputs = []
+  outputs = [None] * len(inputs)
   # Create a new scope in which the caching device is either
   # determined by the parent scope, or is set to place the cached
   # Variable using the same placement as for the rest of the RNN.
@@ -1411,32 +1420,43 @@ def static_rnn(cell,
           structure=output_size, flat_sequence=flat_zero_output)
 
       sequence_length = math_ops.cast(sequence_length, dtypes.int32)
-      min_sequence_length = math_ops.reduce_min(sequence_length)
-      max_sequence_length = math_ops.reduce_max(sequence_length)
+      # When the lengths are known at graph construction time, the steps past
+      # the longest sequence are pure copy-through and need no cell ops.
+      static_sequence_length = tensor_util.constant_value(sequence_length)
+      if static_sequence_length is not None and static_sequence_length.size:
+        static_max_sequence_length = int(static_sequence_length.max())
+      else:
+        static_max_sequence_length = None
 
     # Keras RNN cells only accept state as list, even if it's a single tensor.
     is_keras_rnn_cell = _is_keras_rnn_cell(cell)
     if is_keras_rnn_cell and not nest.is_sequence(state):
       state = [state]
     for time, input_ in enumerate(inputs):
-      if time > 0:
+      if time == 1:
+        # The first step created the cell's variables; every later step
+        # reuses them.
         varscope.reuse_variables()
       # pylint: disable=cell-var-from-loop
       call_cell = lambda: cell(input_, state)
       # pylint: enable=cell-var-from-loop
-      if sequence_length is not None:
+      if (sequence_length is not None and
+          static_max_sequence_length is not None and
+          0 < static_max_sequence_length <= time):
+        # Every sequence has finished. The first step is always built so the
+        # cell's variables get created.
+        output = zero_output
+      elif sequence_length is not None:
         (output, state) = _rnn_step(
             time=time,
             sequence_length=sequence_length,
-            min_sequence_length=min_sequence_length,
-            max_sequence_length=max_sequence_length,
             zero_output=zero_output,
             state=state,
             call_cell=call_cell,
             state_size=cell.state_size)
       else:
         (output, state) = call_cell()
-      outputs.append(output)
+      outputs[time] = output
     # Keras RNN cells only return state as list, even if it's a single tensor.
     if is_keras_rnn_cell and len(state) == 1:
       state = state[0]
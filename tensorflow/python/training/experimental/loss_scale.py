@@ -26,6 +26,7 @@ from tensorflow.python.distribute import reduce_util
 from tensorflow.python.eager import context
 from tensorflow.python.framework import dtypes
 from tensorflow.python.framework import ops
+from tensorflow.python.ops import array_ops
 from tensorflow.python.ops import control_flow_ops
 from tensorflow.python.ops import math_ops
 from tensorflow.python.ops import variables
@@ -63,6 +64,8 @@ class LossScale(trackable.Trackable):
 
   def __init__(self):
     """Initializes the loss scale class."""
+    # Maps a graph key (None in eager mode) to a dict of that graph's weights,
+    # keyed by name.
     self._weights = {}
 
   @abc.abstractmethod
@@ -131,31 +134,23 @@ class LossScale(trackable.Trackable):
         # Set aggregation to NONE, as loss scaling variables should never be
         # aggregated.
         aggregation=variables.VariableAggregation.NONE)
-    if context.executing_eagerly():
-      graph_key = None
-    else:
-      graph = ops.get_default_graph()
-      graph_key = graph._graph_key  # pylint: disable=protected-access
-
-    key = (name, graph_key)
-    if self._weights.get(key, None) is not None:
-      raise RuntimeError('Duplicate variables detected. {}'.format(key))
-    self._weights[key] = variable
+    graph_key = _get_graph_key()
+    graph_weights = self._weights.setdefault(graph_key, {})
+    if graph_weights.get(name, None) is not None:
+      raise RuntimeError('Duplicate variables detected. {}'.format(
+          (name, graph_key)))
+    graph_weights[name] = variable
     self._handle_deferred_dependencies(name=name, trackable=variable)
     return variable
 
   @property
   def _checkpoint_dependencies(self):
     """From Trackable. Gather graph-specific weights to save."""
-    if context.executing_eagerly():
-      graph_key = None
-    else:
-      graph = ops.get_default_graph()
-      graph_key = graph._graph_key  # pylint: disable=protected-access
-    weights = []
-    for (name, g), v in sorted(self._weights.items(), key=lambda i: i[0][0]):
-      if g == graph_key:
-        weights.append(trackable.TrackableReference(name=name, ref=v))
+    graph_weights = self._weights.get(_get_graph_key(), {})
+    weights = [
+        trackable.TrackableReference(name=name, ref=graph_weights[name])
+        for name in sorted(graph_weights)
+    ]
     return super(LossScale, self)._checkpoint_dependencies + weights
 
   def _lookup_dependency(self, name):
@@ -163,12 +158,7 @@ class LossScale(trackable.Trackable):
     unconditional = super(LossScale, self)._lookup_dependency(name)
     if unconditional is not None:
       return unconditional
-    if context.executing_eagerly():
-      graph_key = None
-    else:
-      graph = ops.get_default_graph()
-      graph_key = graph._graph_key  # pylint: disable=protected-access
-    return self._weights.get((name, graph_key), None)
+    return self._weights.get(_get_graph_key(), {}).get(name, None)
 
   @abc.abstractmethod
   def get_config(self):
@@ -181,8 +171,17 @@ class LossScale(trackable.Trackable):
     return cls(**config)
 
 
+def _get_graph_key():
+  """Returns the key of the current graph, or None in eager mode."""
+  if context.executing_eagerly():
+    return None
+  return ops.get_default_graph()._graph_key  # pylint: disable=protected-access
+
+
 def get_loss_scale_weights(loss_scale):
-  return loss_scale._weights.values()  # pylint: disable=protected-access
+  weights = loss_scale._weights  # pylint: disable=protected-access
+  return [v for graph_weights in weights.values()
+          for v in graph_weights.values()]
 
 
 @tf_export('train.experimental.FixedLossScale')
@@ -238,30 +237,6 @@ def _is_all_finite(grads):
   return math_ops.reduce_all(is_finite_per_grad)
 
 
-def _op_in_graph_mode(tensor):
-  """Returns the tensor's op in graph mode, or the tensor in eager mode.
-
-  This is useful because sometimes an op is needed in graph mode instead of a
-  tensor. In eager mode, there are no ops.
-
-  Args:
-    tensor: A tensor.
-
-  Returns:
-    The tensor's op in graph mode. The tensor in eager mode.
-  """
-  if context.executing_eagerly():
-    return tensor
-  return tensor.op
-
-
-def _assign_if_finite(var, value):
-  """Assigns a value to a variable if the value is finite."""
-  return control_flow_ops.cond(
-      math_ops.is_finite(value), lambda: _op_in_graph_mode(var.assign(value)),
-      control_flow_ops.no_op)
-
-
 @tf_export('train.experimental.DynamicLossScale')
 class DynamicLossScale(LossScale):
   """Loss scale that dynamically adjusts itself.
@@ -331,46 +306,45 @@ class DynamicLossScale(LossScale):
     if distribution_strategy_context.has_strategy():
       distribution = distribution_strategy_context.get_cross_replica_context()
 
-      def get_is_finite(grads):
+      def get_is_nonfinite(grads):
         is_finite = _is_all_finite(grads)
         # We cast to float, because we cannot reduce booleans with
         # DistributionStrategy.
-        return math_ops.cast(is_finite, dtypes.float32)
-
-      is_finite_float = distribution.extended.call_for_each_replica(
-          get_is_finite, args=(grads,))
-      reduced_is_finite_float = distribution.reduce(reduce_util.ReduceOp.SUM,
-                                                    is_finite_float, axis=None)
-      is_finite = math_ops.equal(reduced_is_finite_float,
-                                 distribution.num_replicas_in_sync)
+        return math_ops.cast(math_ops.logical_not(is_finite), dtypes.float32)
+
+      is_nonfinite_float = distribution.extended.call_for_each_replica(
+          get_is_nonfinite, args=(grads,))
+      # The sum counts the replicas with nonfinite gradients, so comparing it
+      # to zero does not depend on the number of replicas.
+      reduced_is_nonfinite_float = distribution.reduce(
+          reduce_util.ReduceOp.SUM, is_nonfinite_float, axis=None)
+      is_finite = math_ops.equal(reduced_is_nonfinite_float, 0)
     else:
       is_finite = _is_all_finite(grads)
 
-    def update_if_finite_grads():
-      """Update assuming the gradients are finite."""
-
-      def incr_loss_scale():
-        new_loss_scale = self._current_loss_scale * self._multiplier
-        return control_flow_ops.group(
-            _assign_if_finite(self._current_loss_scale, new_loss_scale),
-            self._num_good_steps.assign(0))
-
-      return control_flow_ops.cond(
-          self._num_good_steps + 1 >= self._increment_period,
-          incr_loss_scale, lambda: _op_in_graph_mode(
-              self._num_good_steps.assign_add(1)))
-
-    def update_if_not_finite_grads():
-      """Update assuming the gradients are nonfinite."""
-
-      new_loss_scale = math_ops.maximum(
-          self._current_loss_scale / self._multiplier, 1)
-      return control_flow_ops.group(
-          self._num_good_steps.assign(0),
-          self._current_loss_scale.assign(new_loss_scale))
-
-    update_op = control_flow_ops.cond(is_finite, update_if_finite_grads,
-                                      update_if_not_finite_grads)
+    # Select the new state with straight-line ops instead of nested conds:
+    # finite gradients either count another good step or, once
+    # `increment_period` is reached, raise the loss scale and reset the count;
+    # nonfinite gradients lower the loss scale and reset the count.
+    num_good_steps = self._num_good_steps + 1
+    should_incr = math_ops.logical_and(
+        is_finite, num_good_steps >= self._increment_period)
+    new_num_good_steps = array_ops.where(
+        math_ops.logical_and(is_finite, math_ops.logical_not(should_incr)),
+        num_good_steps, array_ops.zeros_like(num_good_steps))
+
+    loss_scale = ops.convert_to_tensor(self._current_loss_scale)
+    new_loss_scale = array_ops.where(
+        should_incr, loss_scale * self._multiplier,
+        array_ops.where(is_finite, loss_scale,
+                        math_ops.maximum(loss_scale / self._multiplier, 1)))
+    # Raising the loss scale can overflow, in which case it is kept as is.
+    new_loss_scale = array_ops.where(
+        math_ops.is_finite(new_loss_scale), new_loss_scale, loss_scale)
+
+    update_op = control_flow_ops.group(
+        self._num_good_steps.assign(new_num_good_steps),
+        self._current_loss_scale.assign(new_loss_scale))
     should_apply_gradients = is_finite
     return update_op, should_apply_gradients
 
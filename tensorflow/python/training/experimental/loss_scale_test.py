@@ -25,9 +25,7 @@ from tensorflow.python.distribute import distribution_strategy_context
 from tensorflow.python.distribute import mirrored_strategy
 from tensorflow.python.eager import context
 from tensorflow.python.framework import constant_op
-from tensorflow.python.framework import ops
 from tensorflow.python.framework import test_util
-from tensorflow.python.ops import array_ops
 from tensorflow.python.ops import check_ops
 from tensorflow.python.ops import control_flow_ops
 from tensorflow.python.ops import math_ops
@@ -130,8 +128,7 @@ class DynamicLossScaleTest(test.TestCase, parameterized.TestCase):
       assert_op = check_ops.assert_equal(should_apply_gradients, is_finite)
       if context.executing_eagerly():
         return
-      with ops.control_dependencies([assert_op]):
-        return array_ops.identity(update_op)
+      return control_flow_ops.group(update_op, assert_op)
 
     actual_outputs = []
 